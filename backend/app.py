@@ -1,8 +1,25 @@
-from fastapi import FastAPI, HTTPException
+import os
+
+# Single-row inference gains nothing from BLAS/OpenMP fan-out — pin the
+# native thread pools to 1 before numpy/sklearn are imported. Parallelism
+# comes from uvicorn workers instead.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Dict, Any, List
-import json, os
+from functools import lru_cache
+import asyncio
+import concurrent.futures
+import math
+import pathlib
+import msgspec
+import numpy as np
+import orjson
 import pandas as pd
 
 # === GLOBALS ===
@@ -11,21 +28,83 @@ PREPROC = None
 THRESHOLD = 0.5
 CALIBRATED = True
 FEATURE_SCHEMA = None
+EXPECTED_COLS = None
+FEATURE_NAMES = None
+
+# Fairness mitigation: age must never reach the model, under any spelling
+AGE_COLS = frozenset({"age", "Age", "AGE"})
+
+# Top-coefficient explanation strings, computed once at load time
+EXPLANATIONS = None
+
+# Linear fast path: when the final estimator is a plain logistic regression,
+# scoring reduces to sigmoid(x @ w + b). W/B are unpacked at load time and
+# _score is JIT-compiled when numba is installed (it's optional — deploy
+# targets like HF Spaces may not have it).
+FAST_W = None
+FAST_B = None
+
+try:
+    from numba import njit
+
+    @njit(cache=True)
+    def _score(x, w, b):
+        z = b
+        for i in range(x.shape[0]):
+            z += x[i] * w[i]
+        return 1.0 / (1.0 + math.exp(-z))
+except Exception:
+    # No numba on this deployment (e.g. HF Spaces) — a plain numpy dot is
+    # still far cheaper than the full predict_proba stack
+    def _score(x, w, b):
+        return 1.0 / (1.0 + math.exp(-float(x @ w + b)))
+
+# Pre-serialized JSON for the static endpoints — the artifacts never change
+# after startup, so these routes just return cached bytes.
+MODEL_INFO_BYTES = None
+METRICS_BYTES = None
+METRICS_PAYLOAD = {}
+
+
+def _load_json(p):
+    """Parse a JSON file with orjson, without leaving a handle open."""
+    return orjson.loads(pathlib.Path(p).read_bytes())
+
+
+def _split_metrics(m):
+    """Split a raw metrics dict into (overall, fairness) sub-dicts."""
+    if not m:
+        return {}, {}
+    overall = {k: v for k, v in m.items() if k in {"acc", "prec", "rec", "f1", "auc"}}
+    fairness = {k: v for k, v in m.items() if k in {"SPD", "EOD", "FPR_diff"}}
+    return overall, fairness
 
 ARTIF_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 
+# Dedicated pool for sklearn calls — keeps the event loop (and /health)
+# responsive while predictions run
+EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+
 
 # === ARTIFACT LOADER ===
 def _load_artifacts():
     global MODEL, PREPROC, THRESHOLD, FEATURE_SCHEMA, CALIBRATED
+    global MODEL_INFO_BYTES, METRICS_BYTES, METRICS_PAYLOAD, EXPECTED_COLS
+    global EXPLANATIONS, FAST_W, FAST_B, FEATURE_NAMES
 
     try:
         import joblib
         mpath = os.path.join(ARTIF_DIR, "model_final.pkl")
 
         if os.path.exists(mpath):
-            raw_model = joblib.load(mpath)
+            # mmap_mode maps the pickle's numpy arrays instead of copying
+            # them into RAM (pages are shared across uvicorn workers).
+            # Compressed dumps can't be mmap'd, so fall back to a plain load.
+            try:
+                raw_model = joblib.load(mpath, mmap_mode="r")
+            except Exception:
+                raw_model = joblib.load(mpath)
             print(f"✅ Loaded raw model: {type(raw_model)}")
 
             # If it's a CalibratedClassifierCV, extract its fitted base estimator
@@ -60,16 +139,113 @@ def _load_artifacts():
         MODEL = None
         PREPROC = None
 
+    # Cache the raw input column order so /predict can build its one-row
+    # DataFrame directly, without dtype inference or a per-call column drop
+    if PREPROC is not None and hasattr(PREPROC, "feature_names_in_"):
+        EXPECTED_COLS = [c for c in PREPROC.feature_names_in_
+                         if c not in AGE_COLS]
+        print(f"✅ Cached {len(EXPECTED_COLS)} expected input columns.")
+    else:
+        EXPECTED_COLS = None
+
+    # get_feature_names_out() walks the whole ColumnTransformer — do it
+    # once here instead of anywhere on the request path
+    FEATURE_NAMES = None
+    if PREPROC is not None and hasattr(PREPROC, "get_feature_names_out"):
+        try:
+            FEATURE_NAMES = list(PREPROC.get_feature_names_out())
+        except Exception as e:
+            print(f"⚠️ Could not cache output feature names: {e}")
+
+    # Unpack the linear fast path: only safe when the pipeline is exactly
+    # pre -> logistic regression, so the kernel reproduces predict_proba
+    FAST_W = FAST_B = None
+    try:
+        from sklearn.linear_model import LogisticRegression
+        if (MODEL is not None and hasattr(MODEL, "steps")
+                and len(MODEL.steps) == 2 and PREPROC is not None
+                and isinstance(MODEL.steps[-1][1], LogisticRegression)):
+            final_est = MODEL.steps[-1][1]
+            FAST_W = np.ascontiguousarray(final_est.coef_[0], dtype=np.float64)
+            FAST_B = float(final_est.intercept_[0])
+            _score(np.zeros_like(FAST_W), FAST_W, FAST_B)  # compile/warm at startup
+            print("✅ Linear fast-path scoring enabled.")
+    except Exception as e:
+        print(f"⚠️ Linear fast path unavailable: {e}")
+        FAST_W = FAST_B = None
+
+    # Coefficients and feature names are static after load, so the top-3
+    # explanation strings can be formatted once instead of argsort-ing
+    # per prediction
+    EXPLANATIONS = None
+    try:
+        # MODEL is usually a Pipeline — the coefficients live on its final
+        # estimator; bare linear models expose coef_ directly
+        coefs = getattr(MODEL, "coef_", None)
+        if coefs is None and hasattr(MODEL, "steps"):
+            coefs = getattr(MODEL.steps[-1][1], "coef_", None)
+        if coefs is not None:
+            coefs = coefs[0]
+            if FEATURE_NAMES is not None:
+                names = FEATURE_NAMES
+            else:
+                names = [f"f{i}" for i in range(coefs.shape[0])]
+            top_idx = np.argsort(np.abs(coefs))[::-1][:3]
+            EXPLANATIONS = [f"{names[i]} {'↑' if coefs[i] > 0 else '↓'} (impact)"
+                            for i in top_idx]
+            print("✅ Cached top-coefficient explanations.")
+    except Exception as e:
+        print(f"⚠️ Could not precompute explanations: {e}")
+        EXPLANATIONS = None
+
     # Load threshold
     tpath = os.path.join(ARTIF_DIR, "threshold.json")
     if os.path.exists(tpath):
         try:
-            THRESHOLD = float(json.load(open(tpath))["threshold"])
+            THRESHOLD = float(_load_json(tpath)["threshold"])
         except Exception:
             THRESHOLD = 0.5
     else:
         THRESHOLD = 0.5
 
+    # Cache the static JSON endpoints as bytes — serving them is then a memcpy
+    ipath = os.path.join(STATIC_DIR, "model_info.json")
+    if os.path.exists(ipath):
+        try:
+            MODEL_INFO_BYTES = orjson.dumps(_load_json(ipath))
+        except Exception as e:
+            print(f"⚠️ Failed to cache model_info.json: {e}")
+            MODEL_INFO_BYTES = None
+
+    try:
+        bpath = os.path.join(ARTIF_DIR, "metrics_before.json")
+        apath = os.path.join(ARTIF_DIR, "metrics_after.json")
+        before = _load_json(bpath) if os.path.exists(bpath) else {}
+        after = _load_json(apath) if os.path.exists(apath) else {}
+    except Exception as e:
+        print(f"⚠️ Failed to read metrics files: {e}")
+        before, after = {}, {}
+
+    overall_b, fair_b = _split_metrics(before)
+    overall_a, fair_a = _split_metrics(after)
+    METRICS_PAYLOAD = {
+        "overall_before": overall_b,
+        "overall_after": overall_a,
+        "fairness_before": fair_b,
+        "fairness_after": fair_a,
+    }
+    METRICS_BYTES = orjson.dumps(METRICS_PAYLOAD)
+
+    # Warm up the pipeline so the first real request doesn't pay the lazy
+    # sklearn/BLAS initialization cost
+    if MODEL is not None and PREPROC is not None and hasattr(PREPROC, "feature_names_in_"):
+        try:
+            dummy = pd.DataFrame([{c: 0 for c in PREPROC.feature_names_in_}])
+            MODEL.predict_proba(dummy)
+            print("✅ Pipeline warmed up with a dummy prediction.")
+        except Exception as e:
+            print(f"⚠️ Warm-up prediction failed: {e}")
+
     print(f"Model loaded calibrated={CALIBRATED}, threshold={THRESHOLD}")
 
 
@@ -78,7 +254,9 @@ _load_artifacts()
 
 
 # === FASTAPI APP ===
-app = FastAPI(title="Assignment UI Backend", version="0.1.0")
+# orjson serializes responses in C — much faster than the default json encoder
+app = FastAPI(title="Assignment UI Backend", version="0.1.0",
+              default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -90,10 +268,22 @@ app.add_middleware(
 
 
 # === SCHEMAS ===
-class PredictRequest(BaseModel):
+# msgspec decodes + validates JSON far faster than Pydantic, so the hot
+# /predict endpoint reads its body through this Struct instead.
+class PredictRequest(msgspec.Struct):
     features: Dict[str, Any]
 
 
+class BatchRequest(msgspec.Struct):
+    rows: List[Dict[str, Any]]
+
+
+_PREDICT_DECODER = msgspec.json.Decoder(PredictRequest)
+_BATCH_DECODER = msgspec.json.Decoder(BatchRequest)
+
+
+# Kept for the OpenAPI docs only — /predict builds a plain dict so FastAPI
+# doesn't re-validate the model on the way out.
 class PredictResponse(BaseModel):
     proba: float
     label: int
@@ -106,105 +296,106 @@ class PredictResponse(BaseModel):
 # === ROUTES ===
 @app.get("/health")
 def health():
-    return {"status": "ok", "model_ready": MODEL is not None}
+    return ORJSONResponse({"status": "ok", "model_ready": MODEL is not None})
 
 
 @app.get("/model-info")
 def model_info():
-    path = os.path.join(STATIC_DIR, "model_info.json")
-    if not os.path.exists(path):
+    if MODEL_INFO_BYTES is None:
         raise HTTPException(status_code=500, detail="model_info.json missing")
-    return json.load(open(path))
+    return Response(MODEL_INFO_BYTES, media_type="application/json")
 
 
 @app.get("/metrics")
 def metrics():
-    bpath = os.path.join(ARTIF_DIR, "metrics_before.json")
-    apath = os.path.join(ARTIF_DIR, "metrics_after.json")
-
-    before = json.load(open(bpath)) if os.path.exists(bpath) else {}
-    after = json.load(open(apath)) if os.path.exists(apath) else {}
-
-    def split(m):
-        if not m:
-            return {}, {}
-        overall = {k: v for k, v in m.items() if k in {"acc", "prec", "rec", "f1", "auc"}}
-        fairness = {k: v for k, v in m.items() if k in {"SPD", "EOD", "FPR_diff"}}
-        return overall, fairness
-
-    overall_b, fair_b = split(before)
-    overall_a, fair_a = split(after)
-
-    return {
-        "overall_before": overall_b,
-        "overall_after": overall_a,
-        "fairness_before": fair_b,
-        "fairness_after": fair_a,
-    }
+    return Response(METRICS_BYTES, media_type="application/json")
 
 
 def _drop_fairness_columns(df: pd.DataFrame) -> pd.DataFrame:
-    for col in ["age", "Age", "AGE"]:
-        if col in df.columns:
-            df = df.drop(columns=[col])
-    return df
+    drop = AGE_COLS.intersection(df.columns)
+    return df.drop(columns=list(drop)) if drop else df
 
 
 def _explain_linear(proba: float) -> List[str]:
-    """Simple explanation for linear/logistic models"""
+    """Simple explanation for linear/logistic models (precomputed at load)"""
+    if EXPLANATIONS is not None:
+        return EXPLANATIONS
+    return ["Explanations unavailable; showing probability only."]
+
+
+@lru_cache(maxsize=1024)
+def _predict_core(features_key: tuple) -> float:
+    """Run the pipeline for one payload, keyed by its sorted feature items.
+
+    Identical payloads (users clicking Predict repeatedly) skip the
+    transform + predict entirely. Call _predict_core.cache_clear() if the
+    model is ever reloaded.
+    """
+    features = dict(features_key)
+    if EXPECTED_COLS is not None:
+        row = {c: features.get(c) for c in EXPECTED_COLS}
+        X_raw = pd.DataFrame([row], columns=EXPECTED_COLS)
+    else:
+        X_raw = pd.DataFrame([features])
+        X_raw = _drop_fairness_columns(X_raw)
+
+    # Fast path: transform once, then score with the compiled kernel instead
+    # of walking the sklearn predict_proba stack
+    if FAST_W is not None:
+        try:
+            x = PREPROC.transform(X_raw)
+            if hasattr(x, "toarray"):
+                x = x.toarray()
+            x = np.ascontiguousarray(x[0], dtype=np.float64)
+            # The kernel skips the estimator's input validation — NaN rows
+            # (e.g. a missing numeric feature) must fall through so the full
+            # pipeline raises a proper 400 instead of caching proba=NaN
+            if not np.isnan(x).any():
+                return float(_score(x, FAST_W, FAST_B))
+        except Exception:
+            pass  # fall through to the full pipeline
+
+    # ✅ Step 1: Try using the first calibrated classifier (fitted one)
     try:
-        import numpy as np
-        if hasattr(PREPROC, "get_feature_names_out"):
-            names = list(PREPROC.get_feature_names_out())
-        else:
-            names = [f"f{i}" for i in range(getattr(MODEL, "coef_", [[0]])[0].shape[0])]
-        coefs = getattr(MODEL, "coef_", None)
-        if coefs is None:
-            return ["Model coefficients not available."]
-        coefs = coefs[0]
-        top_idx = np.argsort(np.abs(coefs))[::-1][:3]
-        msgs = []
-        for i in top_idx:
-            direction = "↑" if coefs[i] > 0 else "↓"
-            msgs.append(f"{names[i]} {direction} (impact)")
-        return msgs
-    except Exception:
-        return ["Explanations unavailable; showing probability only."]
-
-
-@app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest):
-    import numpy as np
+        if hasattr(MODEL, "calibrated_classifiers_"):
+            inner = MODEL.calibrated_classifiers_[0].base_estimator
+            return float(inner.predict_proba(X_raw)[:, 1][0])
+        return float(MODEL.predict_proba(X_raw)[:, 1][0])
+    except Exception as e1:
+        # ✅ Step 2: fallback to direct estimator
+        if hasattr(MODEL, "estimator") and hasattr(MODEL.estimator, "predict_proba"):
+            return float(MODEL.estimator.predict_proba(X_raw)[:, 1][0])
+        raise HTTPException(status_code=400, detail=f"Prediction failed: {e1}")
+
+
+@app.post("/predict", responses={200: {"model": PredictResponse}})
+async def predict(request: Request):
     import warnings
     warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
 
+    try:
+        req = _PREDICT_DECODER.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid request body: {e}")
+
     if MODEL is None:
-        return PredictResponse(
-            proba=0.0,
-            label=0,
-            threshold=THRESHOLD,
-            calibrated=CALIBRATED,
-            explanations=["Model not loaded. Add artifacts."],
-            model_ready=False
-        )
+        return ORJSONResponse({
+            "proba": 0.0,
+            "label": 0,
+            "threshold": THRESHOLD,
+            "calibrated": CALIBRATED,
+            "explanations": ["Model not loaded. Add artifacts."],
+            "model_ready": False,
+        })
 
     try:
-        X_raw = pd.DataFrame([req.features])
-        X_raw = _drop_fairness_columns(X_raw)
-
-        # ✅ Step 1: Try using the first calibrated classifier (fitted one)
+        key = tuple(sorted(req.features.items()))
+        loop = asyncio.get_running_loop()
         try:
-            if hasattr(MODEL, "calibrated_classifiers_"):
-                inner = MODEL.calibrated_classifiers_[0].base_estimator
-                proba = float(inner.predict_proba(X_raw)[:, 1][0])
-            else:
-                proba = float(MODEL.predict_proba(X_raw)[:, 1][0])
-        except Exception as e1:
-            # ✅ Step 2: fallback to direct estimator
-            if hasattr(MODEL, "estimator") and hasattr(MODEL.estimator, "predict_proba"):
-                proba = float(MODEL.estimator.predict_proba(X_raw)[:, 1][0])
-            else:
-                raise HTTPException(status_code=400, detail=f"Prediction failed: {e1}")
+            proba = await loop.run_in_executor(EXECUTOR, _predict_core, key)
+        except TypeError:
+            # Unhashable feature values can't go through the cache
+            proba = await loop.run_in_executor(EXECUTOR, _predict_core.__wrapped__, key)
 
         label = int(proba >= THRESHOLD)
 
@@ -213,18 +404,73 @@ def predict(req: PredictRequest):
         except Exception:
             explanations = ["Explanations unavailable; showing probability only."]
 
-        return PredictResponse(
-            proba=proba,
-            label=label,
-            threshold=THRESHOLD,
-            calibrated=CALIBRATED,
-            explanations=explanations,
-            model_ready=True
-        )
+        return ORJSONResponse({
+            "proba": proba,
+            "label": label,
+            "threshold": THRESHOLD,
+            "calibrated": CALIBRATED,
+            "explanations": explanations,
+            "model_ready": True,
+        })
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Prediction failed: {e}")
 
 
+# The endpoint is unauthenticated — cap the batch size so one request
+# can't tie up an executor thread indefinitely
+MAX_BATCH_ROWS = 1000
+
+
+def _predict_batch_core(rows):
+    """Blocking DataFrame build + predict_proba for /predict_batch —
+    runs on EXECUTOR, never on the event loop thread."""
+    if EXPECTED_COLS is not None:
+        X = pd.DataFrame([{c: r.get(c) for c in EXPECTED_COLS} for r in rows],
+                         columns=EXPECTED_COLS)
+    else:
+        X = _drop_fairness_columns(pd.DataFrame(rows))
+
+    try:
+        if hasattr(MODEL, "calibrated_classifiers_"):
+            inner = MODEL.calibrated_classifiers_[0].base_estimator
+            return inner.predict_proba(X)[:, 1]
+        return MODEL.predict_proba(X)[:, 1]
+    except Exception as e1:
+        if hasattr(MODEL, "estimator") and hasattr(MODEL.estimator, "predict_proba"):
+            return MODEL.estimator.predict_proba(X)[:, 1]
+        raise HTTPException(status_code=400, detail=f"Prediction failed: {e1}")
+
+
+@app.post("/predict_batch")
+async def predict_batch(request: Request):
+    """Score many rows in one predict_proba call — sklearn's per-call
+    overhead is amortized, so N rows cost roughly the same as 1."""
+    try:
+        req = _BATCH_DECODER.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid request body: {e}")
+
+    if MODEL is None:
+        return ORJSONResponse({"proba": [], "label": [], "threshold": THRESHOLD,
+                               "model_ready": False})
+    if not req.rows:
+        return ORJSONResponse({"proba": [], "label": [], "threshold": THRESHOLD,
+                               "model_ready": True})
+    if len(req.rows) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413,
+                            detail=f"Batch too large (max {MAX_BATCH_ROWS} rows)")
+
+    try:
+        loop = asyncio.get_running_loop()
+        probs = await loop.run_in_executor(EXECUTOR, _predict_batch_core, req.rows)
 
+        return ORJSONResponse({
+            "proba": probs.tolist(),
+            "label": (probs >= THRESHOLD).astype(int).tolist(),
+            "threshold": THRESHOLD,
+            "model_ready": True,
+        })
 
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Prediction failed: {e}")
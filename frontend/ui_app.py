@@ -21,6 +21,41 @@ st.set_page_config(
 # <-- Change this to your backend deployment if different -->
 BACKEND_URL = "http://127.0.0.1:8000"
 
+# Safe defaults for numeric features the model may expect but the sidebar
+# doesn't ask for — single source of truth, merged with live inputs below.
+SAFE_DEFAULTS: Dict[str, object] = {
+    "Transportation expense": 200,
+    "Distance from Residence to Work": 10,
+    "Work load Average/day": 250,
+    "Hit target": 95,
+    "Son": 1,
+    "Pet": 0,
+    "Weight": 70,
+    "Height": 170,
+}
+
+
+# One Session per Streamlit process: keep-alive reuses the TCP/TLS
+# connection to the backend instead of handshaking on every call.
+@st.cache_resource
+def _http() -> requests.Session:
+    s = requests.Session()
+    s.headers.update({"Connection": "keep-alive"})
+    return s
+
+
+# Model info and metrics are static per deploy — cache them so sidebar
+# changes don't trigger two backend round-trips on every rerun.
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_model_info() -> dict:
+    return _http().get(f"{BACKEND_URL}/model-info", timeout=5).json()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_metrics() -> dict:
+    return _http().get(f"{BACKEND_URL}/metrics", timeout=5).json()
+
+
 st.title("📉 Absenteeism Risk Assessment Dashboard")
 st.markdown(
     "A simple tool to help HR/team leader to spot employees who **may** be at higher risk of frequent absence. "
@@ -73,6 +108,7 @@ bmi = st.sidebar.slider("Body Mass Index (BMI)", 15.0, 40.0, 24.5)
 # -------------------------
 # Some saved pipelines expect slightly different column names; include both safe keys.
 features: Dict[str, object] = {
+    **SAFE_DEFAULTS,
     "Reason for absence": reason,
     "Month of absence": month,
     "Day of the week": dow,      # many pipelines use 'Day of the week'
@@ -86,15 +122,6 @@ features: Dict[str, object] = {
     "Age": age,
     "BMI": bmi,
     "Body mass index": bmi,  # alternative naming
-    # Add safe defaults for numeric features that the model may expect
-    "Transportation expense": 200,
-    "Distance from Residence to Work": 10,
-    "Work load Average/day": 250,
-    "Hit target": 95,
-    "Son": 1,
-    "Pet": 0,
-    "Weight": 70,
-    "Height": 170,
 }
 
 # -------------------------
@@ -130,7 +157,7 @@ with left:
         # show spinner while calling backend
         with st.spinner("Checking model and generating prediction…"):
             try:
-                resp = requests.post(f"{BACKEND_URL}/predict", json={"features": features}, timeout=10)
+                resp = _http().post(f"{BACKEND_URL}/predict", json={"features": features}, timeout=10)
             except Exception as e:
                 st.error(f"⚠️ Could not contact backend at {BACKEND_URL}: {e}")
                 resp = None
@@ -192,11 +219,11 @@ st.divider()
 # -------------------------
 st.subheader("📘 Model overview & performance")
 
-# Fetch model-info + metrics safely
+# Fetch model-info + metrics safely (cached across reruns)
 model_info, metrics_resp = {}, {}
 try:
-    model_info = requests.get(f"{BACKEND_URL}/model-info", timeout=5).json()
-    metrics_resp = requests.get(f"{BACKEND_URL}/metrics", timeout=5).json()
+    model_info = fetch_model_info()
+    metrics_resp = fetch_metrics()
 except Exception:
     pass
 